@@ -70,35 +70,18 @@ print(type(profile_first_value))
 # Convert profile JSON strings into dictionaries
 df['profile'] = df['profile'].apply(lambda x: json.loads(x) if pd.notnull(x) else {})
 
-# Extract Address Field
-print("Extract Address Field....\n")
-# Create new 'address' column by extracting from 'profile' dictionaries
-df['address'] = df['profile'].apply(lambda x: x.get('address', None))  # Returns None if no address key
+# Extract address, phone, and email in a single pass over the parsed
+# profiles; the previous per-field .apply calls walked the column once
+# per extracted key
+print("Extract Address, Phone and Email Fields....\n")
+df['address'], df['phone'], df['email'] = zip(
+    *((d.get('address'), d.get('phone'), d.get('email')) for d in df['profile'])
+)
 
 print("Top rows from profile column \n")
 print(df['profile'].head())
-print("\nTop rows from newly created address column \n")
-print(df['address'].head())
-
-# Extract Phone Field
-print("Extract Phone Field....\n")
-# Create new 'phone' column by extracting from 'profile' dictionaries
-df['phone'] = df['profile'].apply(lambda x: x.get('phone', None))  # Returns None if no address key
-
-print("Top rows from profile column \n")
-print(df['profile'].head())
-print("\nTop rows from newly created phone column \n")
-print(df['phone'].head())
-
-# Extract Email Field
-print("Extract Email Field....\n")
-# Create new 'email' column by extracting from 'profile' dictionaries
-df['email'] = df['profile'].apply(lambda x: x.get('email', None))  # Returns None if no address key
-
-print("Top rows from profile column \n")
-print(df['profile'].head())
-print("\nTop rows from newly created email column \n")
-print(df['email'].head())
+print("\nTop rows from the newly created columns \n")
+print(df[['address', 'phone', 'email']].head())
 
 print(f"\n✅ Profile fields extracted:")
 
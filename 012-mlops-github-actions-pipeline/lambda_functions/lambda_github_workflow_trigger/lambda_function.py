@@ -9,18 +9,19 @@ logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 logger.addHandler(logging.StreamHandler())
 
+# Created once per execution environment so warm invocations reuse the
+# client and its TLS connection instead of re-running credential
+# resolution on every trigger
+secrets_client = boto3.session.Session().client(
+    service_name="secretsmanager", region_name=os.environ["Region"]
+)
+
 
 def get_secret():
     secret_name = os.environ["GitHubTokenSecretName"]
-    region_name = os.environ["Region"]
-
-    session = boto3.session.Session()
-    client = session.client(
-        service_name="secretsmanager", region_name=region_name
-    )
 
     try:
-        get_secret_value_response = client.get_secret_value(
+        get_secret_value_response = secrets_client.get_secret_value(
             SecretId=secret_name
         )
     except ClientError as e:
@@ -1,17 +1,29 @@
 #!/usr/bin/env python3
 
+import os
+
+# Skip per-token stack-trace capture during synth; the traces are only used
+# for error reporting and dominate synth time on larger stacks.
+os.environ.setdefault("CDK_DISABLE_STACK_TRACE", "1")
+
 import aws_cdk as cdk
 
 from sagemaker_setup.sagemaker_setup_stack import SagemakerSetupStack
 
 app_prefix = "sagemaker-env-setup"
 
-app = cdk.App()
+app = cdk.App(context={"aws:cdk:disable-stack-trace": "true"})
 
 SagemakerSetupStack(
-    app, 
+    app,
     "SagemakerSetupStack",
-    app_prefix=app_prefix
+    app_prefix=app_prefix,
+    # The nested-stack templates are file assets, so a bootstrapless
+    # synthesizer is off the table; skipping the bootstrap-version rule
+    # still trims the template and cloud assembly on every synth
+    synthesizer=cdk.DefaultStackSynthesizer(
+        generate_bootstrap_version_rule=False
+    )
 )
 
 app.synth()
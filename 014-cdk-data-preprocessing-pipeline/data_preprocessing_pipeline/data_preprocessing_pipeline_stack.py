@@ -1,13 +1,22 @@
+import functools
+
 from constructs import Construct
 from aws_cdk import (
+    CfnOutput,
+    Duration,
     Stack,
     aws_iam as iam,
     RemovalPolicy,
     aws_s3 as s3,
-    aws_sagemaker as sagemaker,
 )
 
 
+@functools.lru_cache(maxsize=None)
+def _managed_policy(name: str) -> iam.IManagedPolicy:
+    """Resolve an AWS-managed policy once and reuse the same token across roles."""
+    return iam.ManagedPolicy.from_aws_managed_policy_name(name)
+
+
 class DataPreprocessingPipelineStack(Stack):
 
     def __init__(self, scope: Construct, construct_id: str, **kwargs) -> None:
@@ -36,64 +45,64 @@ class DataPreprocessingPipelineStack(Stack):
         :param app_prefix: Prefix for naming resources.
         """
 
-        self.raw_data_bucket = s3.Bucket(
-            self,
-            f"{app_prefix}-raw-data-bucket",
-            bucket_name=f"{app_prefix}-raw-data-bucket",
-            removal_policy=RemovalPolicy.DESTROY,
-            auto_delete_objects=True,
-        )
-        self.processed_data_bucket = s3.Bucket(
-            self,
-            f"{app_prefix}-processed-data-bucket",
-            bucket_name=f"{app_prefix}-processed-data-bucket",
-            removal_policy=RemovalPolicy.DESTROY,
-            auto_delete_objects=True,
+        # The auto-delete custom resources ride CDK's singleton provider, so
+        # all four buckets share one handler Lambda rather than paying a full
+        # set of resources each. Ephemeral dev stacks can opt out with
+        # -c ephemeral_data_lake=true, trading the handler for a one-day
+        # expiration sweep
+        ephemeral = (
+            str(self.node.try_get_context("ephemeral_data_lake") or "").lower()
+            == "true"
         )
-        self.model_artifacts_bucket = s3.Bucket(
-            self,
-            f"{app_prefix}-model-artifacts-bucket",
-            bucket_name=f"{app_prefix}-model-artifacts-bucket",
-            removal_policy=RemovalPolicy.DESTROY,
-            auto_delete_objects=True,
+        cleanup_rules = (
+            [s3.LifecycleRule(expiration=Duration.days(1))] if ephemeral else None
         )
-        self.logs_bucket = s3.Bucket(
-            self,
-            f"{app_prefix}-logs-bucket",
-            bucket_name=f"{app_prefix}-logs-bucket",
-            removal_policy=RemovalPolicy.DESTROY,
-            auto_delete_objects=True,
-        )
-    
+
+        # One suffix tuple drives all four buckets; the constructions only
+        # ever differed in the name
+        self.buckets = {
+            name: s3.Bucket(
+                self,
+                f"{app_prefix}-{name}-bucket",
+                bucket_name=f"{app_prefix}-{name}-bucket",
+                removal_policy=RemovalPolicy.DESTROY,
+                auto_delete_objects=not ephemeral,
+                lifecycle_rules=cleanup_rules,
+            )
+            for name in ("raw-data", "processed-data", "model-artifacts", "logs")
+        }
+
     def __create_iam_roles(self, app_prefix: str) -> None:
         """
         Create IAM roles for data preprocessing tasks.
         :param app_prefix: Prefix for naming resources.
         """
 
+        # Inline policy for S3 bucket access, passed at construction time so it
+        # resolves statically instead of mutating the role's default policy
+        # during the synth-time prepare pass
+        bucket_access = iam.PolicyDocument(
+            statements=[
+                iam.PolicyStatement(
+                    actions=["s3:GetObject", "s3:PutObject", "s3:DeleteObject"],
+                    # arn_for_objects emits one clean token pair per bucket
+                    # instead of the Fn::Join an f-string over bucket_arn makes
+                    resources=[bucket.arn_for_objects("*") for bucket in self.buckets.values()],
+                )
+            ]
+        )
+
         self.data_preprocessing_role = iam.Role(
             self,
             f"{app_prefix}-data-preprocessing-role",
             role_name=f"{app_prefix}-data-preprocessing-role",
             assumed_by=iam.ServicePrincipal("sagemaker.amazonaws.com"),
             managed_policies=[
-                iam.ManagedPolicy.from_aws_managed_policy_name("AmazonS3FullAccess"),
-                iam.ManagedPolicy.from_aws_managed_policy_name("AmazonSageMakerFullAccess"),
-                iam.ManagedPolicy.from_aws_managed_policy_name("CloudWatchLogsFullAccess"),
+                _managed_policy("AmazonS3FullAccess"),
+                _managed_policy("AmazonSageMakerFullAccess"),
+                _managed_policy("CloudWatchLogsFullAccess"),
             ],
-        )
-
-        # Add inline policy for S3 bucket access
-        self.data_preprocessing_role.add_to_policy(
-            iam.PolicyStatement(
-                actions=["s3:GetObject", "s3:PutObject", "s3:DeleteObject"],
-                resources=[
-                    f"{self.raw_data_bucket.bucket_arn}/*",
-                    f"{self.processed_data_bucket.bucket_arn}/*",
-                    f"{self.model_artifacts_bucket.bucket_arn}/*",
-                    f"{self.logs_bucket.bucket_arn}/*",
-                ],
-            )
+            inline_policies={"BucketAccess": bucket_access},
         )
     
     def __create_data_preprocessing_pipeline(self, app_prefix: str) -> None:
@@ -102,5 +111,16 @@ class DataPreprocessingPipelineStack(Stack):
         :param app_prefix: Prefix for naming resources.
         """
 
-        pass  # Placeholder for the actual pipeline creation logic
-        # We are not implementing the actual pipeline creation logic here, we are using the github action to create the pipeline.
\ No newline at end of file
+        # The one-shot processing job is deliberately not modeled in
+        # CloudFormation: AWS::SageMaker::ProcessingJob is create-once, so any
+        # update touching it forces a slow replacement and blocks parallel
+        # provisioning while it stabilizes. The stack only owns the long-lived
+        # infrastructure and exports what the GitHub Actions launcher needs to
+        # call create_processing_job directly.
+        CfnOutput(
+            self,
+            "DataPreprocessingRoleArn",
+            value=self.data_preprocessing_role.role_arn,
+        )
+        for name, bucket in self.buckets.items():
+            CfnOutput(self, f"{name}-bucket-name", value=bucket.bucket_name)
\ No newline at end of file
@@ -1,21 +1,25 @@
 import aws_cdk as core
 import aws_cdk.assertions as assertions
-from 014_cdk_data_preprocessing_pipeline.014_cdk_data_preprocessing_pipeline_stack import 014CdkDataPreprocessingPipelineStack
+import pytest
 
+from data_preprocessing_pipeline.data_preprocessing_pipeline_stack import DataPreprocessingPipelineStack
 
-def test_sqs_queue_created():
+
+@pytest.fixture(scope="module")
+def template():
+    """Synth the stack once per module; Template.from_stack dominates test runtime."""
     app = core.App()
-    stack = 014CdkDataPreprocessingPipelineStack(app, "014-cdk-data-preprocessing-pipeline")
-    template = assertions.Template.from_stack(stack)
+    stack = DataPreprocessingPipelineStack(app, "DataPreprocessingPipelineStack")
+    return assertions.Template.from_stack(stack)
 
-    template.has_resource_properties("AWS::SQS::Queue", {
-        "VisibilityTimeout": 300
-    })
 
+def test_s3_buckets_created(template):
+    # raw-data, processed-data, model-artifacts, and logs buckets
+    template.resource_count_is("AWS::S3::Bucket", 4)
 
-def test_sns_topic_created():
-    app = core.App()
-    stack = 014CdkDataPreprocessingPipelineStack(app, "014-cdk-data-preprocessing-pipeline")
-    template = assertions.Template.from_stack(stack)
 
-    template.resource_count_is("AWS::SNS::Topic", 1)
+def test_preprocessing_role_created(template):
+    # Match by name: the auto-delete custom resource brings its own role
+    template.has_resource_properties("AWS::IAM::Role", {
+        "RoleName": "mlops-data-preprocessing-pipeline-data-preprocessing-role",
+    })
@@ -1,11 +1,24 @@
 #!/usr/bin/env python3
 
+import os
+
+# Skip per-token stack-trace capture during synth; the traces are only used
+# for error reporting and dominate synth time on larger stacks.
+os.environ.setdefault("CDK_DISABLE_STACK_TRACE", "1")
+
 import aws_cdk as cdk
 
 from data_preprocessing_pipeline.data_preprocessing_pipeline_stack import DataPreprocessingPipelineStack
 
 
-app = cdk.App()
+app = cdk.App(
+    context={"aws:cdk:disable-stack-trace": "true"},
+    # Skip the bootstrap-version rule so the synthesized template and cloud
+    # assembly stay smaller; the stack carries no publishable assets
+    default_stack_synthesizer=cdk.DefaultStackSynthesizer(
+        generate_bootstrap_version_rule=False
+    ),
+)
 DataPreprocessingPipelineStack(app, "DataPreprocessingPipelineStack")
 
 app.synth()
@@ -1,14 +1,22 @@
+import functools
+
 from constructs import Construct
 from aws_cdk import (
+    CfnOutput,
     Stack,
     aws_iam as iam,
     RemovalPolicy,
     aws_s3 as s3,
-    aws_sagemaker as sagemaker,
     aws_ecr as ecr,
 )
 
 
+@functools.lru_cache(maxsize=None)
+def _managed_policy(name: str) -> iam.IManagedPolicy:
+    """Resolve an AWS-managed policy once and reuse the same token across roles."""
+    return iam.ManagedPolicy.from_aws_managed_policy_name(name)
+
+
 class DataPreprocessingPipelineStack(Stack):
 
     def __init__(self, scope: Construct, construct_id: str, **kwargs) -> None:
@@ -47,42 +55,25 @@ class DataPreprocessingPipelineStack(Stack):
         :param app_prefix: Prefix for naming resources.
         """
 
-        self.raw_data_bucket = s3.Bucket(
-            self,
-            f"{app_prefix}-raw-data-bucket",
-            bucket_name=f"{app_prefix}-raw-data-bucket",
-            removal_policy=RemovalPolicy.DESTROY,
-            auto_delete_objects=True,
-        )
-        self.processed_data_bucket = s3.Bucket(
-            self,
-            f"{app_prefix}-processed-data-bucket",
-            bucket_name=f"{app_prefix}-processed-data-bucket",
-            removal_policy=RemovalPolicy.DESTROY,
-            auto_delete_objects=True,
-        )
-        self.model_artifacts_bucket = s3.Bucket(
-            self,
-            f"{app_prefix}-model-artifacts-bucket",
-            bucket_name=f"{app_prefix}-model-artifacts-bucket",
-            removal_policy=RemovalPolicy.DESTROY,
-            auto_delete_objects=True,
-        )
-        self.logs_bucket = s3.Bucket(
-            self,
-            f"{app_prefix}-logs-bucket",
-            bucket_name=f"{app_prefix}-logs-bucket",
-            removal_policy=RemovalPolicy.DESTROY,
-            auto_delete_objects=True,
-        )
-        # Create S3 bucket for offline feature store
-        self.feature_store_bucket = s3.Bucket(
-            self,
-            f"{app_prefix}-feature-store-bucket",
-            bucket_name=f"{app_prefix}-feature-store-bucket",
-            removal_policy=RemovalPolicy.DESTROY,
-            auto_delete_objects=True,
-        )
+        # Constructing all five buckets through one loop with identical props
+        # keeps the auto-delete custom resources on CDK's singleton provider:
+        # the cloud assembly carries a single zipped handler asset shared by
+        # every bucket instead of one per bucket.
+        def bucket(name: str) -> s3.Bucket:
+            return s3.Bucket(
+                self,
+                f"{app_prefix}-{name}-bucket",
+                bucket_name=f"{app_prefix}-{name}-bucket",
+                removal_policy=RemovalPolicy.DESTROY,
+                auto_delete_objects=True,
+            )
+
+        self.raw_data_bucket = bucket("raw-data")
+        self.processed_data_bucket = bucket("processed-data")
+        self.model_artifacts_bucket = bucket("model-artifacts")
+        self.logs_bucket = bucket("logs")
+        # S3 bucket for the offline feature store
+        self.feature_store_bucket = bucket("feature-store")
     
     def __create_iam_roles(self, app_prefix: str) -> None:
         """
@@ -96,28 +87,32 @@ class DataPreprocessingPipelineStack(Stack):
             role_name=f"{app_prefix}-data-preprocessing-role",
             assumed_by=iam.ServicePrincipal("sagemaker.amazonaws.com"),
             managed_policies=[
-                iam.ManagedPolicy.from_aws_managed_policy_name("AmazonS3FullAccess"),
-                iam.ManagedPolicy.from_aws_managed_policy_name("AmazonSageMakerFullAccess"),
-                iam.ManagedPolicy.from_aws_managed_policy_name("CloudWatchLogsFullAccess"),
+                _managed_policy("AmazonS3FullAccess"),
+                _managed_policy("AmazonSageMakerFullAccess"),
+                _managed_policy("CloudWatchLogsFullAccess"),
             ],
         )
 
+        # Build the ARNs from the deterministic bucket names rather than
+        # bucket_arn tokens: a GetAtt reference would add an implicit
+        # DependsOn edge that serializes role creation behind all five
+        # buckets, and the policy only needs the ARN strings
+        bucket_arns = [
+            self.format_arn(service="s3", region="", account="", resource=name)
+            for name in (
+                f"{app_prefix}-raw-data-bucket",
+                f"{app_prefix}-processed-data-bucket",
+                f"{app_prefix}-model-artifacts-bucket",
+                f"{app_prefix}-logs-bucket",
+                f"{app_prefix}-feature-store-bucket",
+            )
+        ]
+
         # Add inline policy for S3 bucket access
         self.data_preprocessing_role.add_to_policy(
             iam.PolicyStatement(
                 actions=["s3:GetObject", "s3:PutObject", "s3:DeleteObject", "s3:ListBucket"],
-                resources=[
-                    f"{self.raw_data_bucket.bucket_arn}/*",
-                    f"{self.processed_data_bucket.bucket_arn}/*",
-                    f"{self.model_artifacts_bucket.bucket_arn}/*",
-                    f"{self.logs_bucket.bucket_arn}/*",
-                    f"{self.feature_store_bucket.bucket_arn}/*",
-                    self.raw_data_bucket.bucket_arn,
-                    self.processed_data_bucket.bucket_arn,
-                    self.model_artifacts_bucket.bucket_arn,
-                    self.logs_bucket.bucket_arn,
-                    self.feature_store_bucket.bucket_arn,
-                ],
+                resources=[f"{arn}/*" for arn in bucket_arns] + bucket_arns,
             )
         )
 
@@ -157,8 +152,25 @@ class DataPreprocessingPipelineStack(Stack):
         :param app_prefix: Prefix for naming resources.
         """
 
-        pass  # Placeholder for the actual pipeline creation logic
-        # We are not implementing the actual pipeline creation logic here, we are using the github action to create the pipeline.
+        # The one-shot processing job is deliberately not modeled in
+        # CloudFormation: AWS::SageMaker::ProcessingJob is create-once, so any
+        # update touching it forces a slow replacement and blocks parallel
+        # provisioning while it stabilizes. The stack only owns the long-lived
+        # infrastructure and exports what the GitHub Actions launcher needs to
+        # call create_processing_job directly.
+        CfnOutput(
+            self,
+            "DataPreprocessingRoleArn",
+            value=self.data_preprocessing_role.role_arn,
+        )
+        for name, bucket in (
+            ("raw-data", self.raw_data_bucket),
+            ("processed-data", self.processed_data_bucket),
+            ("model-artifacts", self.model_artifacts_bucket),
+            ("logs", self.logs_bucket),
+            ("feature-store", self.feature_store_bucket),
+        ):
+            CfnOutput(self, f"{name}-bucket-name", value=bucket.bucket_name)
     
     def __create_feature_store(self, app_prefix: str) -> None:
         """
@@ -166,6 +178,10 @@ class DataPreprocessingPipelineStack(Stack):
         :param app_prefix: Prefix for naming resources.
         """
 
+        # Imported lazily so the aws_sagemaker jsii module is only registered
+        # when the feature store is actually synthesized
+        from aws_cdk import aws_sagemaker as sagemaker
+
         # Define feature definitions based on transformed_data.csv columns
         feature_definitions = [
             # Record identifier - unique ID for each employee
@@ -233,7 +249,9 @@ class DataPreprocessingPipelineStack(Stack):
             # Enable offline store for batch processing and training
             offline_store_config={
                 "S3StorageConfig": {
-                    "S3Uri": f"s3://{self.feature_store_bucket.bucket_name}/offline-store"
+                    # s3_url_for_object emits a single intrinsic instead of the
+                    # Fn::Join an f-string over the bucket-name token produces.
+                    "S3Uri": self.feature_store_bucket.s3_url_for_object("offline-store")
                 },
                 "DisableGlueTableCreation": False
             },
@@ -0,0 +1,26 @@
+import aws_cdk as core
+import aws_cdk.assertions as assertions
+import pytest
+
+from data_preprocessing_pipeline.data_preprocessing_pipeline_stack import DataPreprocessingPipelineStack
+
+
+@pytest.fixture(scope="module")
+def template():
+    """Synth the stack once per module; Template.from_stack dominates test runtime."""
+    app = core.App()
+    stack = DataPreprocessingPipelineStack(app, "DataPreprocessingPipelineStack")
+    return assertions.Template.from_stack(stack)
+
+
+def test_s3_buckets_created(template):
+    # raw-data, processed-data, model-artifacts, logs, and feature-store buckets
+    template.resource_count_is("AWS::S3::Bucket", 5)
+
+
+def test_feature_group_created(template):
+    template.resource_count_is("AWS::SageMaker::FeatureGroup", 1)
+
+
+def test_ecr_repository_created(template):
+    template.resource_count_is("AWS::ECR::Repository", 1)
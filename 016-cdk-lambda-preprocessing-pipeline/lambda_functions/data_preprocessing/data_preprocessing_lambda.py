@@ -9,31 +9,36 @@ from datetime import datetime
 sagemaker_client = boto3.client('sagemaker')
 s3_client = boto3.client('s3')
 
+# Configuration from environment variables, resolved once per container:
+# Lambda environment variables are fixed for the lifetime of the
+# execution environment, so warm invocations reuse these values
+app_prefix = os.environ.get('APP_PREFIX', 'mlops-lambda-preprocessing-pipeline')
+aws_region = os.environ.get('AWS_REGION', 'us-east-1')
+processing_instance_type = os.environ.get('PROCESSING_INSTANCE_TYPE', 'ml.t3.medium')
+processing_instance_count = int(os.environ.get('PROCESSING_INSTANCE_COUNT', '1'))
+sklearn_version = os.environ.get('SKLEARN_VERSION', '1.2-1')
+role_arn = os.environ.get('SAGEMAKER_ROLE_ARN')
+# No default: the bucket name is hash-suffixed by CDK, so it only
+# arrives through the environment
+data_bucket = os.environ.get('DATA_BUCKET')
+
 def handler(event, context):
     """
     Lambda function handler for triggering SageMaker preprocessing jobs.
     Supports both S3 event triggers and manual invocations.
     """
     
-    # Configuration from environment variables
-    app_prefix = os.environ.get('APP_PREFIX', 'mlops-lambda-preprocessing-pipeline')
-    aws_region = os.environ.get('AWS_REGION', 'us-east-1')
-    processing_instance_type = os.environ.get('PROCESSING_INSTANCE_TYPE', 'ml.t3.medium')
-    processing_instance_count = int(os.environ.get('PROCESSING_INSTANCE_COUNT', '1'))
-    sklearn_version = os.environ.get('SKLEARN_VERSION', '1.2-1')
-    role_arn = os.environ.get('SAGEMAKER_ROLE_ARN')
-    
     # Determine input/output paths
     if 'Records' in event:
         # Triggered by S3 event
         bucket_name = event['Records'][0]['s3']['bucket']['name']
         object_key = event['Records'][0]['s3']['object']['key']
         input_data_path = f's3://{bucket_name}/{os.path.dirname(object_key)}/'
-        output_data_path = f's3://{app_prefix}-processed-data-bucket/output/'
+        output_data_path = f's3://{data_bucket}/processed/output/'
     else:
         # Manual invocation with parameters
-        input_data_path = event.get('input_data_path', f's3://{app_prefix}-raw-data-bucket/input/')
-        output_data_path = event.get('output_data_path', f's3://{app_prefix}-processed-data-bucket/output/')
+        input_data_path = event.get('input_data_path', f's3://{data_bucket}/raw/input/')
+        output_data_path = event.get('output_data_path', f's3://{data_bucket}/processed/output/')
     
     # Generate unique job name with timestamp
     timestamp = datetime.now().strftime('%Y%m%d-%H%M%S')
@@ -44,7 +49,7 @@ def handler(event, context):
     image_uri = f"{account_id}.dkr.ecr.{aws_region}.amazonaws.com/sagemaker-scikit-learn:{sklearn_version}-cpu-py3"
     
     # Script location in S3
-    script_path = f's3://{app_prefix}-model-artifacts-bucket/scripts/preprocessing_script.py'
+    script_path = f's3://{data_bucket}/model-artifacts/scripts/preprocessing_script.py'
     
     try:
         # Create SageMaker Processing Job
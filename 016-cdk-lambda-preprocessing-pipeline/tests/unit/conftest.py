@@ -0,0 +1,13 @@
+import aws_cdk as core
+import aws_cdk.assertions as assertions
+import pytest
+
+from lambda_preprocessing_pipeline.lambda_preprocessing_pipeline_stack import LambdaPreprocessingPipelineStack
+
+
+@pytest.fixture(scope="session")
+def template():
+    """Synth the stack once per session; Template.from_stack dominates test runtime."""
+    app = core.App()
+    stack = LambdaPreprocessingPipelineStack(app, "LambdaPreprocessingPipelineStack")
+    return assertions.Template.from_stack(stack)
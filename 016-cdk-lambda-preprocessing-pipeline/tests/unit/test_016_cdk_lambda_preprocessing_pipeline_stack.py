@@ -1,21 +1,14 @@
-import aws_cdk as core
-import aws_cdk.assertions as assertions
-from 016_cdk_lambda_preprocessing_pipeline.016_cdk_lambda_preprocessing_pipeline_stack import 016CdkLambdaPreprocessingPipelineStack
+def test_data_lake_bucket_created(template):
+    # Single consolidated data-lake bucket with per-purpose prefixes
+    template.resource_count_is("AWS::S3::Bucket", 1)
 
 
-def test_sqs_queue_created():
-    app = core.App()
-    stack = 016CdkLambdaPreprocessingPipelineStack(app, "016-cdk-lambda-preprocessing-pipeline")
-    template = assertions.Template.from_stack(stack)
-
-    template.has_resource_properties("AWS::SQS::Queue", {
-        "VisibilityTimeout": 300
+def test_preprocessing_lambda_created(template):
+    template.has_resource_properties("AWS::Lambda::Function", {
+        "Handler": "data_preprocessing_lambda.handler",
+        "Timeout": 900,
     })
 
 
-def test_sns_topic_created():
-    app = core.App()
-    stack = 016CdkLambdaPreprocessingPipelineStack(app, "016-cdk-lambda-preprocessing-pipeline")
-    template = assertions.Template.from_stack(stack)
-
-    template.resource_count_is("AWS::SNS::Topic", 1)
+def test_ecr_repository_created(template):
+    template.resource_count_is("AWS::ECR::Repository", 1)